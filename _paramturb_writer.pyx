@@ -0,0 +1,107 @@
+# cython: language_level=3
+"""
+Optional compiled writer for the paramTurb SA / SST closure coefficients.
+
+Stores and loads the coefficients straight from the Fortran module variables
+of libadflow.so, so a setter or getter call is one Python->C call instead of
+one ctypes attribute access per coefficient.  adflow_turb_ctypes uses it
+automatically when it is importable and falls back to its pure-ctypes path
+otherwise.
+
+Build (after ADflow has been patched and compiled):
+    cythonize -i _paramturb_writer.pyx
+
+The paramTurb symbols are left undefined in the extension and resolved when
+it is imported; adflow_turb_ctypes loads libadflow.so with RTLD_GLOBAL first,
+so do not import this module directly.
+"""
+
+# gfortran symbol mangling: __<module>_MOD_<variable> (all lowercase)
+cdef extern from *:
+    """
+    extern double __paramturb_MOD_rsacb1;
+    extern double __paramturb_MOD_rsacb2;
+    extern double __paramturb_MOD_rsacb3;
+    extern double __paramturb_MOD_rsak;
+    extern double __paramturb_MOD_rsacv1;
+    extern double __paramturb_MOD_rsacw1;
+    extern double __paramturb_MOD_rsacw2;
+    extern double __paramturb_MOD_rsacw3;
+    extern double __paramturb_MOD_rsact3;
+    extern double __paramturb_MOD_rsact4;
+    extern double __paramturb_MOD_rsstk;
+    extern double __paramturb_MOD_rssta1;
+    extern double __paramturb_MOD_rsstbetas;
+    extern double __paramturb_MOD_rsstsigk1;
+    extern double __paramturb_MOD_rsstsigw1;
+    extern double __paramturb_MOD_rsstbeta1;
+    extern double __paramturb_MOD_rsstsigk2;
+    extern double __paramturb_MOD_rsstsigw2;
+    extern double __paramturb_MOD_rsstbeta2;
+    """
+    double rsacb1 "__paramturb_MOD_rsacb1"
+    double rsacb2 "__paramturb_MOD_rsacb2"
+    double rsacb3 "__paramturb_MOD_rsacb3"
+    double rsak "__paramturb_MOD_rsak"
+    double rsacv1 "__paramturb_MOD_rsacv1"
+    double rsacw1 "__paramturb_MOD_rsacw1"
+    double rsacw2 "__paramturb_MOD_rsacw2"
+    double rsacw3 "__paramturb_MOD_rsacw3"
+    double rsact3 "__paramturb_MOD_rsact3"
+    double rsact4 "__paramturb_MOD_rsact4"
+
+    double rsstk "__paramturb_MOD_rsstk"
+    double rssta1 "__paramturb_MOD_rssta1"
+    double rsstbetas "__paramturb_MOD_rsstbetas"
+    double rsstsigk1 "__paramturb_MOD_rsstsigk1"
+    double rsstsigw1 "__paramturb_MOD_rsstsigw1"
+    double rsstbeta1 "__paramturb_MOD_rsstbeta1"
+    double rsstsigk2 "__paramturb_MOD_rsstsigk2"
+    double rsstsigw2 "__paramturb_MOD_rsstsigw2"
+    double rsstbeta2 "__paramturb_MOD_rsstbeta2"
+
+
+def set_sa(double cb1, double cb2, double sigma, double kappa, double cv1,
+           double cw2, double cw3, double ct3, double ct4):
+    """Write the 9 SA calibration coefficients and the derived cw1."""
+    global rsacb1, rsacb2, rsacb3, rsak, rsacv1
+    global rsacw1, rsacw2, rsacw3, rsact3, rsact4
+    rsacb1 = cb1
+    rsacb2 = cb2
+    rsacb3 = sigma
+    rsak = kappa
+    rsacv1 = cv1
+    rsacw2 = cw2
+    rsacw3 = cw3
+    rsact3 = ct3
+    rsact4 = ct4
+    # Derived constant
+    rsacw1 = cb1 / (kappa * kappa) + (1.0 + cb2) / sigma
+
+
+def set_sst(double sstk, double a1, double betas, double sigk1, double sigw1,
+            double beta1, double sigk2, double sigw2, double beta2):
+    """Write the 9 SST closure coefficients."""
+    global rsstk, rssta1, rsstbetas, rsstsigk1, rsstsigw1
+    global rsstbeta1, rsstsigk2, rsstsigw2, rsstbeta2
+    rsstk = sstk
+    rssta1 = a1
+    rsstbetas = betas
+    rsstsigk1 = sigk1
+    rsstsigw1 = sigw1
+    rsstbeta1 = beta1
+    rsstsigk2 = sigk2
+    rsstsigw2 = sigw2
+    rsstbeta2 = beta2
+
+
+def get_sa():
+    """Read the SA coefficients in setter order (cw1 after cv1)."""
+    return (rsacb1, rsacb2, rsacb3, rsak, rsacv1,
+            rsacw1, rsacw2, rsacw3, rsact3, rsact4)
+
+
+def get_sst():
+    """Read the 9 SST closure coefficients in setter order."""
+    return (rsstk, rssta1, rsstbetas, rsstsigk1, rsstsigw1,
+            rsstbeta1, rsstsigk2, rsstsigw2, rsstbeta2)
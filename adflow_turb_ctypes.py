@@ -16,14 +16,39 @@ Usage:
     # Set SST coefficients
     set_sst_constants(sstk=0.41, a1=0.31, betas=0.09, sigk1=0.85, sigw1=0.5, beta1=0.075, sigk2=1.0, sigw2=0.856, beta2=0.0828)
 
+If the optional Cython writer (_paramturb_writer.pyx, build with
+`cythonize -i _paramturb_writer.pyx`) is importable, the setters and getters
+use it to store or read all coefficients of a model in a single compiled
+call.  Importing it requires libadflow.so to be reopened with
+RTLD_GLOBAL, which puts all of its symbols in the process-wide namespace;
+delete the built extension to stay on the pure-ctypes path.
+
 Verified on Paracloud HPC (GCC 12.2 + OpenMPI 4.1.5), Job 36920788.
 """
 import ctypes
+import importlib.util
+import operator
 
 # --- Module-level state ---
 _dll = None
+# True once _ensure_init() has run; the public functions test it before
+# calling _ensure_init().
+_initialised = False
 _sa_vars = {}
 _sst_vars = {}
+# c_double handles of the set_order variables as flat tuples, so the setters
+# and getters iterate them directly instead of looking names up in _sa_vars.
+_sa_cells = ()
+_sst_cells = ()
+# Optional compiled writer (_paramturb_writer.pyx); None if not built.
+_writer = None
+
+# Store / load closures for the SA / SST blocks, built by _ensure_init();
+# see _make_store() and _make_load().
+_sa_store = None
+_sst_store = None
+_sa_load = None
+_sst_load = None
 
 # gfortran symbol mangling: __<module>_MOD_<variable> (all lowercase)
 _SA_SYMBOL_MAP = {
@@ -54,15 +79,110 @@ _SST_SYMBOL_MAP = {
     'rsstbeta2': '__paramturb_MOD_rsstbeta2',
 }
 
+# Variables written by the setters, in setter argument order (cw1 included),
+# and the matching keys of the dicts returned by the getters.
+_SA_SET_ORDER = ('rsacb1', 'rsacb2', 'rsacb3', 'rsak', 'rsacv1',
+                 'rsacw1', 'rsacw2', 'rsacw3', 'rsact3', 'rsact4')
+_SA_KEYS = ('cb1', 'cb2', 'sigma', 'kappa', 'cv1',
+            'cw1', 'cw2', 'cw3', 'ct3', 'ct4')
+_SST_SET_ORDER = ('rsstk', 'rssta1', 'rsstbetas', 'rsstsigk1', 'rsstsigw1',
+                  'rsstbeta1', 'rsstsigk2', 'rsstsigw2', 'rsstbeta2')
+_SST_KEYS = ('sstk', 'a1', 'betas', 'sigk1', 'sigw1',
+             'beta1', 'sigk2', 'sigw2', 'beta2')
+
+
+def _overlay(vars_, symbol_map, set_order):
+    """Overlay a block of module variables with a single c_double array.
+
+    gfortran normally emits the initialised paramTurb variables back-to-back
+    in .data, so the whole SA (or SST) block can be written with one memmove.
+    Returns (block, scratch, slots) where slots[i] is the array index of
+    set_order[i], or (None, None, ()) if any symbol is missing or the
+    addresses do not form a contiguous run.
+    """
+    if len(vars_) != len(symbol_map):
+        return None, None, ()
+    size = ctypes.sizeof(ctypes.c_double)
+    addrs = {name: ctypes.addressof(v) for name, v in vars_.items()}
+    base = min(addrs.values())
+    index = {name: (a - base) // size for name, a in addrs.items()}
+    if (any((a - base) % size for a in addrs.values())
+            or sorted(index.values()) != list(range(len(addrs)))):
+        return None, None, ()
+    array_type = ctypes.c_double * len(addrs)
+    block = array_type.from_address(base)
+    return block, array_type(), tuple(index[name] for name in set_order)
+
+
+def _make_store(cells, block, scratch, slots):
+    """Return a store(values) function bound to one variable block.
+
+    Everything the write needs is captured in the closure, so a setter call
+    costs one global lookup (the closure itself) and local loads after that.
+    values are given in set_order.
+    """
+    if block is None:
+        def store(values):
+            for cell, val in zip(cells, values):
+                cell.value = val
+        return store
+
+    memmove = ctypes.memmove
+    nbytes = ctypes.sizeof(block)
+
+    def store(values):
+        # Refresh the scratch copy so variables not in set_order are
+        # preserved, then publish the whole block with a single memcpy.
+        memmove(scratch, block, nbytes)
+        for i, val in zip(slots, values):
+            scratch[i] = val
+        memmove(block, scratch, nbytes)
+    return store
+
+
+def _make_load(cells, block, scratch, slots):
+    """Return a load() function bound to one variable block.
+
+    load() returns the current values in set_order.  With an overlay the
+    whole block is copied out in one memoryview.tolist() call and the
+    values are picked with a single itemgetter, instead of one
+    c_double.value read per variable.
+    """
+    if block is None:
+        def load():
+            return [cell.value for cell in cells]
+        return load
+
+    view = memoryview(block).cast('B').cast('d')
+    pick = operator.itemgetter(*slots)
+
+    def load():
+        return pick(view.tolist())
+    return load
+
 
 def _ensure_init():
     """Load the libadflow.so and cache ctypes references."""
-    global _dll, _sa_vars, _sst_vars
-    if _dll is not None:
+    global _dll, _sa_vars, _sst_vars, _sa_cells, _sst_cells, _writer
+    global _sa_store, _sst_store, _sa_load, _sst_load, _initialised
+    if _initialised:
         return
 
     import adflow.libadflow as _lib
-    _dll = ctypes.CDLL(_lib.__file__, mode=ctypes.RTLD_GLOBAL)
+    # libadflow.so is already mapped by the import above, so this only takes a
+    # reference to it; in_dll() on a RTLD_LOCAL handle searches libadflow and
+    # its dependencies instead of the process-wide symbol namespace.
+    _dll = ctypes.CDLL(_lib.__file__, mode=ctypes.RTLD_LOCAL)
+
+    # The compiled writer resolves the paramTurb symbols at import time, so
+    # libadflow.so is promoted to RTLD_GLOBAL only when the writer is built.
+    _writer = None
+    if importlib.util.find_spec('_paramturb_writer') is not None:
+        ctypes.CDLL(_lib.__file__, mode=ctypes.RTLD_GLOBAL)
+        try:
+            import _paramturb_writer as _writer
+        except ImportError:
+            _writer = None
 
     for name, symbol in _SA_SYMBOL_MAP.items():
         try:
@@ -76,6 +196,22 @@ def _ensure_init():
         except ValueError:
             pass
 
+    # Missing (unpatched) symbols stay None and fail on first use.
+    _sa_cells = tuple(_sa_vars.get(name) for name in _SA_SET_ORDER)
+    _sst_cells = tuple(_sst_vars.get(name) for name in _SST_SET_ORDER)
+
+    sa_overlay = _overlay(_sa_vars, _SA_SYMBOL_MAP, _SA_SET_ORDER)
+    sst_overlay = _overlay(_sst_vars, _SST_SYMBOL_MAP, _SST_SET_ORDER)
+    _sa_store = _make_store(_sa_cells, *sa_overlay)
+    _sst_store = _make_store(_sst_cells, *sst_overlay)
+    if _writer is not None:
+        _sa_load = _writer.get_sa
+        _sst_load = _writer.get_sst
+    else:
+        _sa_load = _make_load(_sa_cells, *sa_overlay)
+        _sst_load = _make_load(_sst_cells, *sst_overlay)
+    _initialised = True
+
 
 # ============================================================
 # SA Interface
@@ -97,18 +233,14 @@ def set_sa_constants(cb1, cb2, sigma, kappa, cv1, cw2, cw3, ct3, ct4):
 
     Note: cw1 is automatically recomputed as cb1/kappa^2 + (1+cb2)/sigma.
     """
-    _ensure_init()
-    _sa_vars['rsacb1'].value = cb1
-    _sa_vars['rsacb2'].value = cb2
-    _sa_vars['rsacb3'].value = sigma
-    _sa_vars['rsak'].value = kappa
-    _sa_vars['rsacv1'].value = cv1
-    _sa_vars['rsacw2'].value = cw2
-    _sa_vars['rsacw3'].value = cw3
-    _sa_vars['rsact3'].value = ct3
-    _sa_vars['rsact4'].value = ct4
-    # Derived constant
-    _sa_vars['rsacw1'].value = cb1 / (kappa * kappa) + (1.0 + cb2) / sigma
+    if not _initialised:
+        _ensure_init()
+    if _writer is not None:
+        _writer.set_sa(cb1, cb2, sigma, kappa, cv1, cw2, cw3, ct3, ct4)
+    else:
+        # Derived constant
+        cw1 = cb1 / (kappa * kappa) + (1.0 + cb2) / sigma
+        _sa_store((cb1, cb2, sigma, kappa, cv1, cw1, cw2, cw3, ct3, ct4))
 
 
 def set_sa_defaults():
@@ -125,19 +257,9 @@ def get_sa_constants():
     Returns:
         dict with keys: cb1, cb2, sigma, kappa, cv1, cw1 (derived), cw2, cw3, ct3, ct4
     """
-    _ensure_init()
-    return {
-        'cb1':   _sa_vars['rsacb1'].value,
-        'cb2':   _sa_vars['rsacb2'].value,
-        'sigma': _sa_vars['rsacb3'].value,
-        'kappa': _sa_vars['rsak'].value,
-        'cv1':   _sa_vars['rsacv1'].value,
-        'cw1':   _sa_vars['rsacw1'].value,
-        'cw2':   _sa_vars['rsacw2'].value,
-        'cw3':   _sa_vars['rsacw3'].value,
-        'ct3':   _sa_vars['rsact3'].value,
-        'ct4':   _sa_vars['rsact4'].value,
-    }
+    if not _initialised:
+        _ensure_init()
+    return dict(zip(_SA_KEYS, _sa_load()))
 
 
 # ============================================================
@@ -158,16 +280,12 @@ def set_sst_constants(sstk, a1, betas, sigk1, sigw1, beta1, sigk2, sigw2, beta2)
         sigw2 : sigma_omega2 (default 0.856)
         beta2 : beta_2 (default 0.0828)
     """
-    _ensure_init()
-    _sst_vars['rsstk'].value = sstk
-    _sst_vars['rssta1'].value = a1
-    _sst_vars['rsstbetas'].value = betas
-    _sst_vars['rsstsigk1'].value = sigk1
-    _sst_vars['rsstsigw1'].value = sigw1
-    _sst_vars['rsstbeta1'].value = beta1
-    _sst_vars['rsstsigk2'].value = sigk2
-    _sst_vars['rsstsigw2'].value = sigw2
-    _sst_vars['rsstbeta2'].value = beta2
+    if not _initialised:
+        _ensure_init()
+    if _writer is not None:
+        _writer.set_sst(sstk, a1, betas, sigk1, sigw1, beta1, sigk2, sigw2, beta2)
+    else:
+        _sst_store((sstk, a1, betas, sigk1, sigw1, beta1, sigk2, sigw2, beta2))
 
 
 def set_sst_defaults():
@@ -185,15 +303,6 @@ def get_sst_constants():
     Returns:
         dict with keys: sstk, a1, betas, sigk1, sigw1, beta1, sigk2, sigw2, beta2
     """
-    _ensure_init()
-    return {
-        'sstk':  _sst_vars['rsstk'].value,
-        'a1':    _sst_vars['rssta1'].value,
-        'betas': _sst_vars['rsstbetas'].value,
-        'sigk1': _sst_vars['rsstsigk1'].value,
-        'sigw1': _sst_vars['rsstsigw1'].value,
-        'beta1': _sst_vars['rsstbeta1'].value,
-        'sigk2': _sst_vars['rsstsigk2'].value,
-        'sigw2': _sst_vars['rsstsigw2'].value,
-        'beta2': _sst_vars['rsstbeta2'].value,
-    }
+    if not _initialised:
+        _ensure_init()
+    return dict(zip(_SST_KEYS, _sst_load()))
@@ -9,6 +9,7 @@ SA 可校准参数 (7 个, 不含转捩系数 ct3/ct4):
     mpirun --oversubscribe -np 2 python run_naca0012_sa_verify.py
 """
 import os
+import glob
 import re
 import numpy as np
 from mpi4py import MPI
@@ -34,13 +35,14 @@ SA_PARAMS = {
 }
 
 # 生成 3 组随机系数
+# 一次向量化采样 (按行展开, 与逐个参数调用 uniform 的随机序列相同)
 np.random.seed(42)
-random_sets = []
-for i in range(3):
-    s = {}
-    for name, (default, lo, hi) in SA_PARAMS.items():
-        s[name] = np.random.uniform(lo, hi)
-    random_sets.append(s)
+_lo = np.array([lo for default, lo, hi in SA_PARAMS.values()])
+_hi = np.array([hi for default, lo, hi in SA_PARAMS.values()])
+random_sets = [
+    dict(zip(SA_PARAMS, row))
+    for row in np.random.uniform(_lo, _hi, size=(3, len(SA_PARAMS)))
+]
 
 # 默认系数
 default_set = {name: default for name, (default, lo, hi) in SA_PARAMS.items()}
@@ -94,8 +96,10 @@ if pts is not None and len(pts) > 0:
     z_min_l, z_max_l = pts[:, 2].min(), pts[:, 2].max()
 else:
     z_min_l, z_max_l = 0.0, 0.0
-z_min = comm.allreduce(z_min_l, op=MPI.MIN)
-z_max = comm.allreduce(z_max_l, op=MPI.MAX)
+# min 和 max 合成一次 Allreduce: 对 [z_min, -z_max] 取 MIN
+z_ext = np.empty(2, dtype=np.float64)
+comm.Allreduce(np.array([z_min_l, -z_max_l], dtype=np.float64), z_ext, op=MPI.MIN)
+z_min, z_max = z_ext[0], -z_ext[1]
 z_mid = 0.5 * (z_min + z_max)
 if rank == 0:
     print(f"\nMesh z: [{z_min:.6f}, {z_max:.6f}], slice at z={z_mid:.6f}")
@@ -103,36 +107,143 @@ solver.addSlices("z", [z_mid])
 
 
 # ---- 解析切片 .dat ----
+# 切片文件头的正则只编译一次
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+_NODES_RE = re.compile(r"NODES\s*=\s*(\d+)")
+
+
 def parse_slice_dat(filepath):
-    with open(filepath, "r") as f:
-        lines = f.readlines()
+    """解析 ADflow writeSlicesFile 输出的 ASCII Tecplot .dat 文件。
+
+    单遍读取: 逐行扫描文件头直到 DATAPACKING 行, 再把文件句柄直接交给
+    np.loadtxt 读取 Nodes 行给出的数据点数 (其后的 FELINESEG 连接关系不读)。
+    文件头没有 Nodes 行, 或数据块中有非数字行时, 改用 np.genfromtxt 读到
+    文件尾: 列数与首行不同的行 (连接关系) 被跳过, 含非数字的行被丢弃。
+    """
     var_names = []
-    for line in lines:
-        if "VARIABLES" in line.upper():
-            var_names = re.findall(r'"([^"]+)"', line)
-            if var_names:
+    n_nodes = None
+    with open(filepath, "r") as f:
+        # 用 readline 而不是 for 迭代, 之后才能 tell/seek 回到数据块起点
+        for line in iter(f.readline, ""):
+            s = line.strip().upper()
+            if not var_names and s.startswith("VARIABLES"):
+                var_names = _QUOTED_RE.findall(line)
+            elif s.startswith("NODES"):
+                m = _NODES_RE.search(s)
+                n_nodes = int(m.group(1)) if m else None
+            elif s.startswith("DATAPACKING"):
                 break
-    data_rows = []
-    in_data = False
-    for line in lines:
-        s = line.strip()
-        if not s:
-            continue
-        if s.upper().startswith("ZONE"):
-            in_data = True
-            continue
-        if s.upper().startswith(("VARIABLES", "TITLE", "DATAPACKING")):
-            continue
-        if in_data:
+        else:
+            return None
+        data_start = f.tell()
+
+        data = None
+        if n_nodes is not None:
             try:
-                vals = [float(v) for v in s.split()]
-                if len(vals) >= 3:
-                    data_rows.append(vals)
-            except ValueError:
-                continue
-    if not data_rows:
+                data = np.loadtxt(f, dtype=np.float64, ndmin=2, max_rows=n_nodes,
+                                  comments=None)
+            except ValueError:  # 数据块中有非数字行
+                f.seek(data_start)
+        if data is None:
+            data = np.genfromtxt(f, dtype=np.float64, ndmin=2, comments=None,
+                                 invalid_raise=False)
+            data = data[~np.isnan(data).any(axis=1)]
+    if data.shape[0] == 0 or data.shape[1] < 3:
+        return None
+    return {"var_names": var_names, "data": data}
+
+
+# ---- 气动问题 (所有算例共用一个实例) ----
+# 只改 name 复用同一实例, 省去每个算例重新构造 AeroProblem 的开销。
+# 流场仍在每个算例前重置为自由来流 (见下方 resetFlow)。
+ap = AeroProblem(
+    name="n0012_sa_default",
+    mach=0.75, altitude=10000, alpha=1.5,
+    areaRef=1.0, chordRef=1.0,
+    evalFuncs=["cl", "cd"],
+)
+
+# ---- 切片后处理: 解析切片并拆分上下表面 Cp ----
+def find_idx(name_idx, candidates):
+    """按候选名顺序在规范化列名表中查找, 返回第一个命中的列号。"""
+    return next((name_idx[c.lower()] for c in candidates
+                 if c.lower() in name_idx), None)
+
+
+# 各算例共用同一网格, 切片的列名和点序相同 (只有 Cp 变化): 列号按列名元组
+# 缓存, 上下表面按 x 排序后的点索引在 x 坐标不变时沿用上一算例的结果
+_column_cache = {}
+_order_x = None
+_order = None
+
+
+def slice_columns(var_names):
+    """返回切片数据中 (x, y, Cp) 的列号, 找不到的为 None。"""
+    key = tuple(var_names)
+    cols = _column_cache.get(key)
+    if cols is None:
+        # 规范化列名 -> 列号 (重名时取第一列)
+        name_idx = {}
+        for k, n in enumerate(var_names):
+            name_idx.setdefault(n.lower().replace(" ", ""), k)
+        cols = _column_cache[key] = (
+            find_idx(name_idx, ["XoC", "CoordinateX", "X"]),
+            find_idx(name_idx, ["YoC", "CoordinateY", "Y"]),
+            find_idx(name_idx, ["CoefPressure", "Cp"]),
+        )
+    return cols
+
+
+def surface_order(x, y):
+    """返回上下表面的点索引 (idx_upper, idx_lower), 各自按 x 排序。"""
+    global _order_x, _order
+    if _order is None or not np.array_equal(x, _order_x):
+        if y is not None:
+            idx_upper = np.flatnonzero(y >= 0)
+            idx_lower = np.flatnonzero(y < 0)
+        else:
+            le_idx = np.argmin(x)
+            idx_upper = np.arange(le_idx + 1)
+            idx_lower = np.arange(le_idx, len(x))
+        _order = (idx_upper[np.argsort(x[idx_upper])],
+                  idx_lower[np.argsort(x[idx_lower])])
+        _order_x = x
+    return _order
+
+
+def extract_surface_cp(slice_file):
+    """解析切片文件, 返回按 x 排序的上下表面 x/Cp; 切片不可用时返回 None。"""
+    parsed = parse_slice_dat(slice_file)
+    if parsed is None:
+        print(f"  WARNING: No data in slice file")
         return None
-    return {"var_names": var_names, "data": np.array(data_rows)}
+
+    data = parsed["data"]
+    ix, iy, icp = slice_columns(parsed["var_names"])
+
+    if icp is None:
+        print(f"  WARNING: No Cp column!")
+        return None
+
+    x = data[:, ix] if ix is not None else None
+    y = data[:, iy] if iy is not None else None
+    cp = data[:, icp]
+
+    if x is None:
+        print(f"  WARNING: No x column!")
+        return None
+
+    idx_upper, idx_lower = surface_order(x, y)
+
+    x_up, cp_up = x[idx_upper], cp[idx_upper]
+    x_lo, cp_lo = x[idx_lower], cp[idx_lower]
+
+    print(f"  Surface: {len(x_up)} upper, {len(x_lo)} lower")
+    print(f"  Cp range: [{cp.min():.4f}, {cp.max():.4f}]")
+    return {
+        "x_upper": x_up, "cp_upper": cp_up,
+        "x_lower": x_lo, "cp_lower": cp_lo,
+    }
 
 
 # ---- 逐组求解 ----
@@ -165,13 +276,13 @@ for case_idx, (label, coeffs) in enumerate(all_sets):
         print(f"  Set: cv1={pt.rsacv1:.6f}, cw2={pt.rsacw2:.6f}, cw3={pt.rsacw3:.6f}")
         print(f"  Derived cw1={pt.rsacw1:.6f} (expected={cw1:.6f})")
 
-    ap = AeroProblem(
-        name=f"n0012_sa_{label}",
-        mach=0.75, altitude=10000, alpha=1.5,
-        areaRef=1.0, chordRef=1.0,
-        evalFuncs=["cl", "cd"],
-    )
+    # 复用同一个 AeroProblem, 只改 name (函数名和切片文件名按算例区分)
+    ap.name = f"n0012_sa_{label}"
 
+    # 每个算例都从自由来流冷启动: 若从上一算例的解热启动, 求解在 nCycles
+    # 处停止时 CL 会依赖算例顺序, 额外迭代本身也会改变 CL, 无法据此判断
+    # 系数修改是否生效
+    solver.resetFlow(ap)
     solver(ap)
     funcs = {}
     solver.evalFunctions(ap, funcs)
@@ -186,70 +297,17 @@ for case_idx, (label, coeffs) in enumerate(all_sets):
     if rank == 0:
         slice_file = f"{OUTPUT_DIR}/n0012_sa_{label}_slices.dat"
         if not os.path.exists(slice_file):
-            for fn in os.listdir(OUTPUT_DIR):
-                if label in fn and "slice" in fn and fn.endswith(".dat"):
-                    slice_file = f"{OUTPUT_DIR}/{fn}"
-                    break
+            # glob 只返回匹配项, 不逐个扫描目录
+            matches = glob.glob(f"{OUTPUT_DIR}/*{label}*slice*.dat")
+            if matches:
+                slice_file = matches[0]
 
         if os.path.exists(slice_file):
             fsize = os.path.getsize(slice_file)
             print(f"  Slice file: {slice_file} ({fsize} bytes)")
-
-            parsed = parse_slice_dat(slice_file)
-            if parsed is None:
-                print(f"  WARNING: No data in slice file")
-                continue
-
-            var_names = parsed["var_names"]
-            data = parsed["data"]
-
-            def find_idx(candidates):
-                for c in candidates:
-                    for k, n in enumerate(var_names):
-                        if n.lower().replace(" ", "") == c.lower():
-                            return k
-                return None
-
-            ix = find_idx(["XoC", "CoordinateX", "X"])
-            iy = find_idx(["YoC", "CoordinateY", "Y"])
-            icp = find_idx(["CoefPressure", "Cp"])
-
-            if icp is None:
-                print(f"  WARNING: No Cp column!")
-                continue
-
-            x = data[:, ix] if ix is not None else None
-            y = data[:, iy] if iy is not None else None
-            cp = data[:, icp]
-
-            if x is None:
-                print(f"  WARNING: No x column!")
-                continue
-
-            # 上下表面
-            if y is not None:
-                upper = y >= 0
-                lower = y < 0
-            else:
-                le_idx = np.argmin(x)
-                upper = np.arange(len(x)) <= le_idx
-                lower = np.arange(len(x)) >= le_idx
-
-            x_up, cp_up = x[upper], cp[upper]
-            order_u = np.argsort(x_up)
-            x_up, cp_up = x_up[order_u], cp_up[order_u]
-
-            x_lo, cp_lo = x[lower], cp[lower]
-            order_l = np.argsort(x_lo)
-            x_lo, cp_lo = x_lo[order_l], cp_lo[order_l]
-
-            results[label] = {
-                "cl": cl, "cd": cd, "coeffs": coeffs,
-                "x_upper": x_up, "cp_upper": cp_up,
-                "x_lower": x_lo, "cp_lower": cp_lo,
-            }
-            print(f"  Surface: {len(x_up)} upper, {len(x_lo)} lower")
-            print(f"  Cp range: [{cp.min():.4f}, {cp.max():.4f}]")
+            surface = extract_surface_cp(slice_file)
+            if surface is not None:
+                results[label] = {"cl": cl, "cd": cd, "coeffs": coeffs, **surface}
         else:
             print(f"  WARNING: Slice file not found")
 
@@ -258,14 +316,14 @@ if rank == 0:
     save_data = {}
     for label, res in results.items():
         p = label + "_"
-        save_data[p + "cl"] = np.float64(res["cl"])
-        save_data[p + "cd"] = np.float64(res["cd"])
+        save_data[p + "cl"] = res["cl"]
+        save_data[p + "cd"] = res["cd"]
         save_data[p + "x_upper"] = res["x_upper"]
         save_data[p + "cp_upper"] = res["cp_upper"]
         save_data[p + "x_lower"] = res["x_lower"]
         save_data[p + "cp_lower"] = res["cp_lower"]
         for pname, pval in res["coeffs"].items():
-            save_data[p + pname] = np.float64(pval)
+            save_data[p + pname] = pval
 
     npz_path = f"{OUTPUT_DIR}/naca0012_sa_verify.npz"
     np.savez(npz_path, **save_data)
@@ -7,6 +7,7 @@ NACA0012 SST 系数修改验证: 1 组默认 + 3 组随机采样, 提取上下
 无需编译, 使用 GitHub 预编译的 libadflow.so。
 """
 import os
+import glob
 import re
 import numpy as np
 from mpi4py import MPI
@@ -31,13 +32,14 @@ SST_PARAMS = {
 }
 
 # 生成 3 组随机系数 (每组 9 个参数全部从各自范围内独立采样)
+# 一次向量化采样 (按行展开, 与逐个参数调用 uniform 的随机序列相同)
 np.random.seed(42)
-random_sets = []
-for i in range(3):
-    s = {}
-    for name, (default, lo, hi) in SST_PARAMS.items():
-        s[name] = np.random.uniform(lo, hi)
-    random_sets.append(s)
+_lo = np.array([lo for default, lo, hi in SST_PARAMS.values()])
+_hi = np.array([hi for default, lo, hi in SST_PARAMS.values()])
+random_sets = [
+    dict(zip(SST_PARAMS, row))
+    for row in np.random.uniform(_lo, _hi, size=(3, len(SST_PARAMS)))
+]
 
 # 默认系数
 default_set = {name: default for name, (default, lo, hi) in SST_PARAMS.items()}
@@ -103,8 +105,10 @@ if pts_init is not None and len(pts_init) > 0:
 else:
     z_min_local = 0.0
     z_max_local = 0.0
-z_min = comm.allreduce(z_min_local, op=MPI.MIN)
-z_max = comm.allreduce(z_max_local, op=MPI.MAX)
+# min 和 max 合成一次 Allreduce: 对 [z_min, -z_max] 取 MIN
+z_ext = np.empty(2, dtype=np.float64)
+comm.Allreduce(np.array([z_min_local, -z_max_local], dtype=np.float64), z_ext, op=MPI.MIN)
+z_min, z_max = z_ext[0], -z_ext[1]
 z_mid = 0.5 * (z_min + z_max)
 
 if rank == 0:
@@ -115,54 +119,161 @@ solver.addSlices("z", [z_mid])
 
 
 # ---- 解析 ADflow 切片 .dat 文件 ----
+# 切片文件头的正则只编译一次
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+_NODES_RE = re.compile(r"NODES\s*=\s*(\d+)")
+
+
 def parse_slice_dat(filepath):
-    """解析 ADflow writeSlicesFile 输出的 ASCII Tecplot .dat 文件。"""
-    with open(filepath, "r") as f:
-        lines = f.readlines()
+    """解析 ADflow writeSlicesFile 输出的 ASCII Tecplot .dat 文件。
 
-    # 找变量名行
+    单遍读取: 逐行扫描文件头直到 DATAPACKING 行, 再把文件句柄直接交给
+    np.loadtxt 读取 Nodes 行给出的数据点数 (其后的 FELINESEG 连接关系不读)。
+    文件头没有 Nodes 行, 或数据块中有非数字行时, 改用 np.genfromtxt 读到
+    文件尾: 列数与首行不同的行 (连接关系) 被跳过, 含非数字的行被丢弃。
+    """
     var_names = []
-    for line in lines:
-        if line.strip().upper().startswith("VARIABLES") or line.strip().upper().startswith("\""):
-            var_names = re.findall(r'"([^"]+)"', line)
-            if var_names:
+    n_nodes = None
+    with open(filepath, "r") as f:
+        # 用 readline 而不是 for 迭代, 之后才能 tell/seek 回到数据块起点
+        for line in iter(f.readline, ""):
+            s = line.strip().upper()
+            if not var_names and s.startswith("VARIABLES"):
+                var_names = _QUOTED_RE.findall(line)
+            elif s.startswith("NODES"):
+                m = _NODES_RE.search(s)
+                n_nodes = int(m.group(1)) if m else None
+            elif s.startswith("DATAPACKING"):
                 break
+        else:
+            return None
+        data_start = f.tell()
 
-    if not var_names:
-        # 第二行通常是变量定义
-        if len(lines) > 1:
-            var_names = re.findall(r'"([^"]+)"', lines[1])
-
-    # 解析数据
-    data_rows = []
-    in_data = False
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            continue
-        if stripped.upper().startswith("ZONE"):
-            in_data = True
-            continue
-        if stripped.upper().startswith("VARIABLES") or stripped.upper().startswith("TITLE"):
-            continue
-        if stripped.upper().startswith("DATAPACKING") or stripped.upper().startswith("NODES"):
-            continue
-        if in_data:
+        data = None
+        if n_nodes is not None:
             try:
-                vals = [float(v) for v in stripped.split()]
-                if len(vals) >= 3:
-                    data_rows.append(vals)
-            except ValueError:
-                continue
+                data = np.loadtxt(f, dtype=np.float64, ndmin=2, max_rows=n_nodes,
+                                  comments=None)
+            except ValueError:  # 数据块中有非数字行
+                f.seek(data_start)
+        if data is None:
+            data = np.genfromtxt(f, dtype=np.float64, ndmin=2, comments=None,
+                                 invalid_raise=False)
+            data = data[~np.isnan(data).any(axis=1)]
+    if data.shape[0] == 0 or data.shape[1] < 3:
+        return None
+    return {"var_names": var_names, "data": data}
+
 
-    if not data_rows:
+# ---- 气动问题 (所有算例共用一个实例) ----
+# 只改 name 复用同一实例, 省去每个算例重新构造 AeroProblem 的开销。
+# 流场仍在每个算例前重置为自由来流 (见下方 resetFlow)。
+ap = AeroProblem(
+    name="n0012_default",
+    mach=0.75,
+    altitude=10000,
+    alpha=1.5,
+    areaRef=1.0,
+    chordRef=1.0,
+    evalFuncs=["cl", "cd"],
+)
+
+# ---- 切片后处理: 解析切片并拆分上下表面 Cp ----
+def find_idx(name_idx, candidates):
+    """按候选名顺序在规范化列名表中查找, 返回第一个命中的列号。"""
+    return next((name_idx[c.lower()] for c in candidates
+                 if c.lower() in name_idx), None)
+
+
+# 各算例共用同一网格, 切片的列名和点序相同 (只有 Cp 变化): 列号按列名元组
+# 缓存, 上下表面按 x 排序后的点索引在 x 坐标不变时沿用上一算例的结果
+_column_cache = {}
+_order_x = None
+_order = None
+
+
+def slice_columns(var_names):
+    """返回切片数据中 (x, y, Cp, x/c) 的列号, 找不到的为 None。"""
+    key = tuple(var_names)
+    cols = _column_cache.get(key)
+    if cols is None:
+        # 规范化列名 -> 列号 (重名时取第一列)
+        name_idx = {}
+        for k, n in enumerate(var_names):
+            name_idx.setdefault(n.lower().replace(" ", ""), k)
+        cols = _column_cache[key] = (
+            find_idx(name_idx, ["CoordinateX", "X"]),
+            find_idx(name_idx, ["CoordinateY", "Y"]),
+            find_idx(name_idx, ["CoefPressure", "Cp", "cp"]),
+            find_idx(name_idx, ["XoC", "x/c"]),
+        )
+    return cols
+
+
+def surface_order(x, y):
+    """返回上下表面的点索引 (idx_upper, idx_lower), 各自按 x 排序。"""
+    global _order_x, _order
+    if _order is None or not np.array_equal(x, _order_x):
+        if y is not None:
+            # 用 y 坐标区分上下表面
+            y_mid = np.median(y)
+            idx_upper = np.flatnonzero(y >= y_mid)
+            idx_lower = np.flatnonzero(y < y_mid)
+        else:
+            # 如果没有 y 列, 用 LE 位置分割
+            le_idx = np.argmin(x)
+            idx_upper = np.arange(le_idx, len(x))
+            idx_lower = np.arange(le_idx + 1)
+        _order = (idx_upper[np.argsort(x[idx_upper])],
+                  idx_lower[np.argsort(x[idx_lower])])
+        _order_x = x
+    return _order
+
+
+def extract_surface_cp(slice_file):
+    """解析切片文件, 返回按 x/c 排序的上下表面 x/Cp; 切片不可用时返回 None。"""
+    parsed = parse_slice_dat(slice_file)
+    if parsed is None:
+        print(f"  WARNING: No data in slice file")
         return None
 
-    data = np.array(data_rows)
-    return {"var_names": var_names, "data": data}
+    var_names = parsed["var_names"]
+    data = parsed["data"]
+    print(f"  Variables: {var_names}")
+    print(f"  Data shape: {data.shape}")
 
+    ix, iy, icp, ixoc = slice_columns(var_names)
 
-# ---- 逐组求解并提取 Cp ----
+    if icp is None:
+        print(f"  WARNING: No Cp column found!")
+        return None
+
+    # 用 x/c 列或 CoordinateX 归一化
+    if ixoc is not None:
+        x = data[:, ixoc]
+    elif ix is not None:
+        x_raw = data[:, ix]
+        x = (x_raw - x_raw.min()) / max(x_raw.max() - x_raw.min(), 1e-10)
+    else:
+        print(f"  WARNING: No x column found!")
+        return None
+
+    cp = data[:, icp]
+    y = data[:, iy] if iy is not None else None
+    idx_upper, idx_lower = surface_order(x, y)
+
+    x_upper, cp_upper = x[idx_upper], cp[idx_upper]
+    x_lower, cp_lower = x[idx_lower], cp[idx_lower]
+
+    print(f"  Surface: {len(x_upper)} upper pts, {len(x_lower)} lower pts")
+    print(f"  Cp range: [{cp.min():.4f}, {cp.max():.4f}]")
+    return {
+        "x_upper": x_upper, "cp_upper": cp_upper,
+        "x_lower": x_lower, "cp_lower": cp_lower,
+    }
+
+
+# ---- 逐组求解 ----
 results = {}
 
 for case_idx, (label, coeffs) in enumerate(all_sets):
@@ -190,16 +301,13 @@ for case_idx, (label, coeffs) in enumerate(all_sets):
               f"betas={pt.rsstbetas:.5f}, beta1={pt.rsstbeta1:.5f}, "
               f"sigk2={pt.rsstsigk2:.5f}, beta2={pt.rsstbeta2:.5f}")
 
-    # 设置气动问题
-    ap = AeroProblem(
-        name=f"n0012_{label}",
-        mach=0.75,
-        altitude=10000,
-        alpha=1.5,
-        areaRef=1.0,
-        chordRef=1.0,
-        evalFuncs=["cl", "cd"],
-    )
+    # 复用同一个 AeroProblem, 只改 name (函数名和切片文件名按算例区分)
+    ap.name = f"n0012_{label}"
+
+    # 每个算例都从自由来流冷启动: 若从上一算例的解热启动, 求解在 nCycles
+    # 处停止时 CL 会依赖算例顺序, 额外迭代本身也会改变 CL, 无法据此判断
+    # 系数修改是否生效
+    solver.resetFlow(ap)
 
     # 求解
     solver(ap)
@@ -217,89 +325,17 @@ for case_idx, (label, coeffs) in enumerate(all_sets):
     if rank == 0:
         slice_file = f"/workspace/repo/examples/NACA0012/output/n0012_{label}_slices.dat"
         if not os.path.exists(slice_file):
-            # 尝试找到文件 (可能带不同后缀)
-            for fn in os.listdir("/workspace/repo/examples/NACA0012/output"):
-                if label in fn and "slice" in fn and fn.endswith(".dat"):
-                    slice_file = f"/workspace/repo/examples/NACA0012/output/{fn}"
-                    break
+            # 尝试找到文件 (可能带不同后缀): glob 只返回匹配项, 不逐个扫描目录
+            matches = glob.glob(f"/workspace/repo/examples/NACA0012/output/*{label}*slice*.dat")
+            if matches:
+                slice_file = matches[0]
 
         if os.path.exists(slice_file):
             fsize = os.path.getsize(slice_file)
             print(f"  Slice file: {slice_file} ({fsize} bytes)")
-
-            parsed = parse_slice_dat(slice_file)
-            if parsed is None:
-                print(f"  WARNING: No data in slice file")
-                continue
-
-            var_names = parsed["var_names"]
-            data = parsed["data"]
-            print(f"  Variables: {var_names}")
-            print(f"  Data shape: {data.shape}")
-
-            # 查找列索引
-            def find_idx(candidates):
-                for c in candidates:
-                    for k, n in enumerate(var_names):
-                        if n.lower().replace(" ", "") == c.lower():
-                            return k
-                return None
-
-            ix = find_idx(["CoordinateX", "X"])
-            iy = find_idx(["CoordinateY", "Y"])
-            icp = find_idx(["CoefPressure", "Cp", "cp"])
-            ixoc = find_idx(["XoC", "x/c"])
-
-            if icp is None:
-                print(f"  WARNING: No Cp column found!")
-                continue
-
-            # 用 x/c 列或 CoordinateX 归一化
-            if ixoc is not None:
-                x = data[:, ixoc]
-            elif ix is not None:
-                x_raw = data[:, ix]
-                x = (x_raw - x_raw.min()) / max(x_raw.max() - x_raw.min(), 1e-10)
-            else:
-                print(f"  WARNING: No x column found!")
-                continue
-
-            cp = data[:, icp]
-
-            # 用 y 坐标区分上下表面
-            if iy is not None:
-                y = data[:, iy]
-                y_mid = np.median(y)
-                upper = y >= y_mid
-                lower = ~upper
-            else:
-                # 如果没有 y 列, 用 LE 位置分割
-                le_idx = np.argmin(x)
-                upper = np.zeros(len(x), dtype=bool)
-                lower = np.zeros(len(x), dtype=bool)
-                upper[le_idx:] = True
-                lower[:le_idx + 1] = True
-
-            x_upper = x[upper]
-            cp_upper = cp[upper]
-            order_u = np.argsort(x_upper)
-            x_upper = x_upper[order_u]
-            cp_upper = cp_upper[order_u]
-
-            x_lower = x[lower]
-            cp_lower = cp[lower]
-            order_l = np.argsort(x_lower)
-            x_lower = x_lower[order_l]
-            cp_lower = cp_lower[order_l]
-
-            results[label] = {
-                "cl": cl, "cd": cd,
-                "coeffs": coeffs,
-                "x_upper": x_upper, "cp_upper": cp_upper,
-                "x_lower": x_lower, "cp_lower": cp_lower,
-            }
-            print(f"  Surface: {len(x_upper)} upper pts, {len(x_lower)} lower pts")
-            print(f"  Cp range: [{cp.min():.4f}, {cp.max():.4f}]")
+            surface = extract_surface_cp(slice_file)
+            if surface is not None:
+                results[label] = {"cl": cl, "cd": cd, "coeffs": coeffs, **surface}
         else:
             print(f"  WARNING: Slice file not found")
 
@@ -308,14 +344,14 @@ if rank == 0:
     save_data = {}
     for label, res in results.items():
         prefix = label + "_"
-        save_data[prefix + "cl"] = np.float64(res["cl"])
-        save_data[prefix + "cd"] = np.float64(res["cd"])
+        save_data[prefix + "cl"] = res["cl"]
+        save_data[prefix + "cd"] = res["cd"]
         save_data[prefix + "x_upper"] = res["x_upper"]
         save_data[prefix + "cp_upper"] = res["cp_upper"]
         save_data[prefix + "x_lower"] = res["x_lower"]
         save_data[prefix + "cp_lower"] = res["cp_lower"]
         for pname, pval in res["coeffs"].items():
-            save_data[prefix + pname] = np.float64(pval)
+            save_data[prefix + pname] = pval
 
     npz_path = "/workspace/repo/examples/NACA0012/output/naca0012_sst_verify.npz"
     np.savez(npz_path, **save_data)
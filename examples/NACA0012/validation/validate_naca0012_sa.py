@@ -14,6 +14,7 @@ SA 可校准参数 (7 个, 不含转捩系数 ct3/ct4):
     mpirun -np 4 python validate_naca0012_sa.py
 """
 import os
+import mmap
 import sys
 import re
 import numpy as np
@@ -52,13 +53,14 @@ SA_PARAMS = {
 }
 
 # 生成 3 组随机系数
+# 一次向量化采样 (按行展开, 与逐个参数调用 uniform 的随机序列相同)
 np.random.seed(42)
-random_sets = []
-for i in range(3):
-    s = {}
-    for name, (default, lo, hi) in SA_PARAMS.items():
-        s[name] = np.random.uniform(lo, hi)
-    random_sets.append(s)
+_lo = np.array([lo for default, lo, hi in SA_PARAMS.values()])
+_hi = np.array([hi for default, lo, hi in SA_PARAMS.values()])
+random_sets = [
+    dict(zip(SA_PARAMS, row))
+    for row in np.random.uniform(_lo, _hi, size=(3, len(SA_PARAMS)))
+]
 
 # 默认系数
 default_set = {name: default for name, (default, lo, hi) in SA_PARAMS.items()}
@@ -68,19 +70,25 @@ all_sets = [("default", default_set)] + [
     (f"random_{i+1}", random_sets[i]) for i in range(3)
 ]
 
+# rank 0 的多行输出 (算例列表、汇总表) 先收集到列表, 再一次
+# sys.stdout.write 写出, 不和其他进程/求解器的输出逐行交错
 if rank == 0:
-    print("=" * 70)
-    print("  NACA0012 SA Coefficient Verification (ctypes API, HPC)")
-    print("  M=0.75, alpha=1.5 deg, 4 cases (1 default + 3 random)")
-    print("=" * 70)
-    print(f"  Mesh: {MESH_FILE}")
-    print(f"  Output: {OUTPUT_DIR}")
+    log = [
+        "=" * 70,
+        "  NACA0012 SA Coefficient Verification (ctypes API, HPC)",
+        "  M=0.75, alpha=1.5 deg, 4 cases (1 default + 3 random)",
+        "=" * 70,
+        f"  Mesh: {MESH_FILE}",
+        f"  Output: {OUTPUT_DIR}",
+    ]
     for label, coeffs in all_sets:
-        print(f"\n  [{label}]")
+        log.append(f"\n  [{label}]")
         for name, val in coeffs.items():
             default = SA_PARAMS[name][0]
             diff = f"  (delta={val - default:+.6f})" if label != "default" else ""
-            print(f"    {name:8s} = {val:.6f}{diff}")
+            log.append(f"    {name:8s} = {val:.6f}{diff}")
+    sys.stdout.write("\n".join(log) + "\n")
+    sys.stdout.flush()
 
 # ---- 求解器选项 ----
 solverOptions = {
@@ -113,8 +121,10 @@ if pts is not None and len(pts) > 0:
     z_min_l, z_max_l = pts[:, 2].min(), pts[:, 2].max()
 else:
     z_min_l, z_max_l = 0.0, 0.0
-z_min = comm.allreduce(z_min_l, op=MPI.MIN)
-z_max = comm.allreduce(z_max_l, op=MPI.MAX)
+# min 和 max 合成一次 Allreduce: 对 [z_min, -z_max] 取 MIN
+z_ext = np.empty(2, dtype=np.float64)
+comm.Allreduce(np.array([z_min_l, -z_max_l], dtype=np.float64), z_ext, op=MPI.MIN)
+z_min, z_max = z_ext[0], -z_ext[1]
 z_mid = 0.5 * (z_min + z_max)
 if rank == 0:
     print(f"\nMesh z: [{z_min:.6f}, {z_max:.6f}], slice at z={z_mid:.6f}")
@@ -122,37 +132,158 @@ solver.addSlices("z", [z_mid])
 
 
 # ---- 解析切片 .dat ----
+# 切片文件头的正则只编译一次。_HEADER_RE 从 Variables 行匹配到 DATAPACKING
+# 行 (含换行), 分组 1 为 Variables 行等号后的内容
+_HEADER_RE = re.compile(
+    rb"VARIABLES([^\n]*)\n(?:[^\n]*\n)*?[ \t]*DATAPACKING[^\n]*\n", re.I)
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+_NODES_RE = re.compile(r"NODES\s*=\s*(\d+)")
+
+
 def parse_slice_dat(filepath):
+    """解析切片文件: 对 mmap 映射的文件内容做一次 _HEADER_RE 搜索定位文件头,
+    再把文件句柄 seek 到数据块起点交给 np.loadtxt, 只读 Nodes 行给出的点数
+    (其后的 FELINESEG 连接关系不读)。文件头没有 Nodes 行时改用
+    np.genfromtxt 读到文件尾, 列数与首行不同的行 (连接关系) 被跳过;
+    数据块中有非数字行时同样改用 np.genfromtxt, 含非数字的行被丢弃。
+    """
     with open(filepath, "r") as f:
-        lines = f.readlines()
-    var_names = []
-    for line in lines:
-        if "VARIABLES" in line.upper():
-            var_names = re.findall(r'"([^"]+)"', line)
-            if var_names:
-                break
-    data_rows = []
-    in_data = False
-    for line in lines:
-        s = line.strip()
-        if not s:
-            continue
-        if s.upper().startswith("ZONE"):
-            in_data = True
-            continue
-        if s.upper().startswith(("VARIABLES", "TITLE", "DATAPACKING")):
-            continue
-        if in_data:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                m = _HEADER_RE.search(mm)
+                if m is None:
+                    return None
+                header = m.group(0).decode()
+                var_names = _QUOTED_RE.findall(m.group(1).decode())
+                data_start = m.end()
+        except ValueError:  # 空文件无法 mmap
+            return None
+        nodes = _NODES_RE.search(header.upper())
+        n_nodes = int(nodes.group(1)) if nodes else None
+
+        f.seek(data_start)
+        data = None
+        if n_nodes is not None:
             try:
-                vals = [float(v) for v in s.split()]
-                if len(vals) >= 3:
-                    data_rows.append(vals)
-            except ValueError:
-                continue
-    if not data_rows:
+                data = np.loadtxt(f, dtype=np.float64, ndmin=2, max_rows=n_nodes,
+                                  comments=None)
+            except ValueError:  # 数据块中有非数字行
+                f.seek(data_start)
+        if data is None:
+            data = np.genfromtxt(f, dtype=np.float64, ndmin=2, comments=None,
+                                 invalid_raise=False)
+            data = data[~np.isnan(data).any(axis=1)]
+    if data.shape[0] == 0 or data.shape[1] < 3:
+        return None
+    return {"var_names": var_names, "data": data}
+
+
+def find_idx(name_idx, candidates):
+    """按候选名顺序在规范化列名表中查找, 返回第一个命中的列号。"""
+    return next((name_idx[c.lower()] for c in candidates
+                 if c.lower() in name_idx), None)
+
+
+# 列号按列名元组缓存: 各算例共用同一网格和输出设置, 列名相同,
+# 只有第一次解析时需要查找
+_column_cache = {}
+
+
+def slice_columns(var_names):
+    """返回切片数据中 (x, y, Cp) 的列号, 找不到的为 None。"""
+    key = tuple(var_names)
+    cols = _column_cache.get(key)
+    if cols is None:
+        # 规范化列名 -> 列号 (重名时取第一列)
+        name_idx = {}
+        for k, n in enumerate(var_names):
+            name_idx.setdefault(n.lower().replace(" ", ""), k)
+        cols = _column_cache[key] = (
+            find_idx(name_idx, ["XoC", "CoordinateX", "X"]),
+            find_idx(name_idx, ["YoC", "CoordinateY", "Y"]),
+            find_idx(name_idx, ["CoefPressure", "Cp"]),
+        )
+    return cols
+
+
+def find_slice_file(name, label):
+    """查找切片文件, 返回 (路径, 字节数); 找不到时返回 (None, None)。
+
+    先对期望文件名做一次 stat (同时得到是否存在和大小); 不存在时用一次
+    os.scandir 遍历输出目录, 取第一个名字含 label 的切片 .dat 文件,
+    大小取自 DirEntry 的 stat 结果, 不再单独 exists / getsize。
+    """
+    path = os.path.join(OUTPUT_DIR, name)
+    try:
+        return path, os.stat(path).st_size
+    except FileNotFoundError:
+        pass
+    with os.scandir(OUTPUT_DIR) as it:
+        for entry in it:
+            fn = entry.name
+            if label in fn and "slice" in fn and fn.endswith(".dat"):
+                return entry.path, entry.stat().st_size
+    return None, None
+
+
+def _split_surfaces(x, y, cp):
+    """拆分上下表面并按 x 排序, 返回 (x_up, cp_up, x_lo, cp_lo, cp_min, cp_max)。
+
+    全部点按 x 做一次稳定排序, 再在排序后的序列上按 y 符号 (y 为 None 时
+    按原始点号相对前缘点的位置, 前缘点两侧都取) 拆分。
+    """
+    order = np.argsort(x, kind="mergesort")
+    x_s = x[order]
+    cp_s = cp[order]
+    if y is not None:
+        upper = y[order] >= 0
+        lower = ~upper
+    else:
+        le_idx = np.argmin(x)
+        upper = order <= le_idx
+        lower = order >= le_idx
+    return (x_s[upper], cp_s[upper], x_s[lower], cp_s[lower],
+            cp.min(), cp.max())
+
+
+def extract_surface_cp(slice_file):
+    """解析切片文件并拆分上下表面, 返回按 x 排序的上下表面 x/Cp;
+    切片不可用时返回 None。
+    """
+    parsed = parse_slice_dat(slice_file)
+    if parsed is None:
+        print(f"  WARNING: No data in slice file")
         return None
-    return {"var_names": var_names, "data": np.array(data_rows)}
 
+    data = parsed["data"]
+    ix, iy, icp = slice_columns(parsed["var_names"])
+    if icp is None or ix is None:
+        print(f"  WARNING: Missing Cp or x column")
+        return None
+
+    x = data[:, ix]
+    cp = data[:, icp]
+    y = data[:, iy] if iy is not None else None
+
+    x_up, cp_up, x_lo, cp_lo, cp_min, cp_max = _split_surfaces(x, y, cp)
+
+    print(f"  Surface: {len(x_up)} upper, {len(x_lo)} lower")
+    print(f"  Cp range: [{cp_min:.4f}, {cp_max:.4f}]")
+    return {
+        "x_upper": x_up, "cp_upper": cp_up,
+        "x_lower": x_lo, "cp_lower": cp_lo,
+    }
+
+
+# ---- 气动问题 (所有算例共用一个实例) ----
+# 每个新 AeroProblem 都要重新做大气模型计算和 evalFuncs 解析, 复用同一实例
+# 可省去这部分开销。流场仍在每个算例前重置为自由来流 (见下方 resetFlow)。
+ap = AeroProblem(
+    name="n0012_sa_default",
+    mach=0.75, altitude=10000, alpha=1.5,
+    areaRef=1.0, chordRef=1.0,
+    evalFuncs=["cl", "cd"],
+)
 
 # ---- 逐组求解 ----
 results = {}
@@ -185,13 +316,13 @@ for case_idx, (label, coeffs) in enumerate(all_sets):
         print(f"  ctypes set: cv1={c['cv1']:.6f}, cw2={c['cw2']:.6f}, cw3={c['cw3']:.6f}")
         print(f"  Derived cw1={c['cw1']:.6f} (expected={cw1_expected:.6f})")
 
-    ap = AeroProblem(
-        name=f"n0012_sa_{label}",
-        mach=0.75, altitude=10000, alpha=1.5,
-        areaRef=1.0, chordRef=1.0,
-        evalFuncs=["cl", "cd"],
-    )
+    # 复用同一个 AeroProblem, 只改 name (函数名和切片文件名按算例区分)
+    ap.name = f"n0012_sa_{label}"
 
+    # 每个算例都从自由来流冷启动: 若从上一算例的解热启动, 求解在 nCycles
+    # 处停止时 CL 会依赖算例顺序, 额外迭代本身也会改变 CL, 无法据此判断
+    # 系数修改是否生效
+    solver.resetFlow(ap)
     solver(ap)
     funcs = {}
     solver.evalFunctions(ap, funcs)
@@ -204,105 +335,54 @@ for case_idx, (label, coeffs) in enumerate(all_sets):
 
     # 切片文件
     if rank == 0:
-        slice_file = os.path.join(OUTPUT_DIR, f"n0012_sa_{label}_slices.dat")
-        if not os.path.exists(slice_file):
-            for fn in os.listdir(OUTPUT_DIR):
-                if label in fn and "slice" in fn and fn.endswith(".dat"):
-                    slice_file = os.path.join(OUTPUT_DIR, fn)
-                    break
-
-        if os.path.exists(slice_file):
-            fsize = os.path.getsize(slice_file)
-            print(f"  Slice file: {slice_file} ({fsize} bytes)")
+        slice_file, fsize = find_slice_file(f"n0012_sa_{label}_slices.dat", label)
 
-            parsed = parse_slice_dat(slice_file)
-            if parsed is None:
-                print(f"  WARNING: No data in slice file")
-                results[label] = {"cl": cl, "cd": cd, "coeffs": coeffs}
-                continue
-
-            var_names = parsed["var_names"]
-            data = parsed["data"]
-
-            def find_idx(candidates):
-                for c in candidates:
-                    for k, n in enumerate(var_names):
-                        if n.lower().replace(" ", "") == c.lower():
-                            return k
-                return None
-
-            ix = find_idx(["XoC", "CoordinateX", "X"])
-            iy = find_idx(["YoC", "CoordinateY", "Y"])
-            icp = find_idx(["CoefPressure", "Cp"])
-
-            if icp is not None and ix is not None:
-                x = data[:, ix]
-                cp = data[:, icp]
-                y = data[:, iy] if iy is not None else None
-
-                if y is not None:
-                    upper = y >= 0
-                    lower = y < 0
-                else:
-                    le_idx = np.argmin(x)
-                    upper = np.arange(len(x)) <= le_idx
-                    lower = np.arange(len(x)) >= le_idx
-
-                x_up, cp_up = x[upper], cp[upper]
-                order_u = np.argsort(x_up)
-                x_up, cp_up = x_up[order_u], cp_up[order_u]
-
-                x_lo, cp_lo = x[lower], cp[lower]
-                order_l = np.argsort(x_lo)
-                x_lo, cp_lo = x_lo[order_l], cp_lo[order_l]
-
-                results[label] = {
-                    "cl": cl, "cd": cd, "coeffs": coeffs,
-                    "x_upper": x_up, "cp_upper": cp_up,
-                    "x_lower": x_lo, "cp_lower": cp_lo,
-                }
-                print(f"  Surface: {len(x_up)} upper, {len(x_lo)} lower")
-                print(f"  Cp range: [{cp.min():.4f}, {cp.max():.4f}]")
-            else:
-                print(f"  WARNING: Missing Cp or x column")
-                results[label] = {"cl": cl, "cd": cd, "coeffs": coeffs}
+        if slice_file is not None:
+            print(f"  Slice file: {slice_file} ({fsize} bytes)")
+            surface = extract_surface_cp(slice_file)
         else:
             print(f"  WARNING: Slice file not found")
-            results[label] = {"cl": cl, "cd": cd, "coeffs": coeffs}
+            surface = None
+        results[label] = {"cl": cl, "cd": cd, "coeffs": coeffs, **(surface or {})}
 
 # ---- 保存 & 汇总 ----
 if rank == 0:
     save_data = {}
     for label, res in results.items():
         p = label + "_"
-        save_data[p + "cl"] = np.float64(res["cl"])
-        save_data[p + "cd"] = np.float64(res["cd"])
+        save_data[p + "cl"] = res["cl"]
+        save_data[p + "cd"] = res["cd"]
         if "x_upper" in res:
             save_data[p + "x_upper"] = res["x_upper"]
             save_data[p + "cp_upper"] = res["cp_upper"]
             save_data[p + "x_lower"] = res["x_lower"]
             save_data[p + "cp_lower"] = res["cp_lower"]
         for pname, pval in res["coeffs"].items():
-            save_data[p + pname] = np.float64(pval)
+            save_data[p + pname] = pval
 
     npz_path = os.path.join(OUTPUT_DIR, "naca0012_sa_verify.npz")
     np.savez(npz_path, **save_data)
     print(f"\nSaved: {npz_path}")
 
     # 对比表
-    print(f"\n{'=' * 70}")
-    print(f"  Summary")
-    print(f"{'=' * 70}")
-    print(f"  {'Case':<12s} {'CL':>12s} {'CD':>12s}")
-    print(f"  {'-'*12} {'-'*12} {'-'*12}")
-    for label, res in results.items():
-        print(f"  {label:<12s} {res['cl']:12.8f} {res['cd']:12.8f}")
-
-    # 验证: 所有 CL 不应完全相同
-    cls = [res["cl"] for res in results.values()]
-    if len(set(f"{v:.10f}" for v in cls)) == 1:
-        print("\n  !!! WARNING: ALL CL VALUES IDENTICAL - ctypes may not be working !!!")
+    log = [
+        f"\n{'=' * 70}",
+        "  Summary",
+        "=" * 70,
+        f"  {'Case':<12s} {'CL':>12s} {'CD':>12s}",
+        f"  {'-'*12} {'-'*12} {'-'*12}",
+    ]
+    log.extend(f"  {label:<12s} {res['cl']:12.8f} {res['cd']:12.8f}"
+               for label, res in results.items())
+
+    # 验证: 所有 CL 不应完全相同 (极差小于 1e-10 视为相同)
+    cls = np.fromiter((res["cl"] for res in results.values()),
+                      dtype=np.float64, count=len(results))
+    if np.ptp(cls) < 1e-10:
+        log.append("\n  !!! WARNING: ALL CL VALUES IDENTICAL - ctypes may not be working !!!")
     else:
-        print(f"\n  >>> ALL {len(cls)} CASES DIFFERENT - ctypes API VERIFIED <<<")
+        log.append(f"\n  >>> ALL {len(cls)} CASES DIFFERENT - ctypes API VERIFIED <<<")
 
-    print("\nDONE")
+    log.append("\nDONE")
+    sys.stdout.write("\n".join(log) + "\n")
+    sys.stdout.flush()
@@ -131,6 +131,12 @@ fi
 # Copy ctypes interface to adflow package directory
 cp "$ADFLOW_ROOT/adflow_turb_ctypes.py" "$ADFLOW_ROOT/adflow/adflow_turb_ctypes.py" 2>/dev/null || true
 
+# The optional Cython writer (_paramturb_writer.pyx) is NOT built here; the
+# ctypes interface works without it.  To build it (needs Cython + a C compiler):
+#   cd "$ADFLOW_ROOT" && cythonize -i _paramturb_writer.pyx
+# When it is importable, adflow_turb_ctypes reopens libadflow.so with
+# RTLD_GLOBAL so the writer's extern symbols resolve (see README).
+
 # --- Step 5: Verify ---
 echo ""
 echo "[5/5] Verifying installation..."
@@ -27,6 +27,11 @@ Usage (inside MDO Lab Docker or HPC):
     make clean && make
     pip install -e .
 
+A successful run writes the stamp file $ADFLOW_SRC/.adflow_turb_patched (a
+hash of this script plus the mtime and size of the four patched files).  A
+later run whose stamp still matches exits without touching the sources.  The
+file is untracked in the ADflow checkout; delete it to force a full re-patch.
+
 Python API after rebuild (via ctypes):
     from adflow_turb_ctypes import (
         set_sa_constants, set_sa_defaults, get_sa_constants,
@@ -43,32 +48,138 @@ Python API after rebuild (via ctypes):
                       sigk2=1.0, sigw2=0.856, beta2=0.0828)
 """
 
+import hashlib
 import os
 import re
 import shutil
+import sys
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: backups are always written out
+    fcntl = None
 
 ADFLOW_SRC = os.environ.get(
     "ADFLOW_SRC", "/home/mdolabuser/repos/adflow/src"
 )
-PARAMTURB_F90 = os.path.join(ADFLOW_SRC, "modules", "paramTurb.F90")
-INIT_FLOW_F90 = os.path.join(ADFLOW_SRC, "initFlow", "initializeFlow.F90")
-SST_F90 = os.path.join(ADFLOW_SRC, "turbulence", "SST.F90")
-TURBUTILS_F90 = os.path.join(ADFLOW_SRC, "turbulence", "turbUtils.F90")
+# Source paths are resolved once at import (the tree is often a bind mount
+# or symlink in the MDO Lab containers).  This also makes os.replace in
+# _patch_file replace the real file rather than a symlink pointing at it.
+# realpath is non-strict, so a missing file keeps its joined path and the
+# "not found, skipping" branch still applies.
+PARAMTURB_F90 = os.path.realpath(os.path.join(ADFLOW_SRC, "modules", "paramTurb.F90"))
+INIT_FLOW_F90 = os.path.realpath(os.path.join(ADFLOW_SRC, "initFlow", "initializeFlow.F90"))
+SST_F90 = os.path.realpath(os.path.join(ADFLOW_SRC, "turbulence", "SST.F90"))
+TURBUTILS_F90 = os.path.realpath(os.path.join(ADFLOW_SRC, "turbulence", "turbUtils.F90"))
+
+# Written after a successful run; see _patch_stamp()
+PATCH_SENTINEL = os.path.join(ADFLOW_SRC, ".adflow_turb_patched")
+
+# Linux ioctl that makes dst a copy-on-write clone of src (reflink) on
+# filesystems that share extents (Btrfs, XFS with reflink=1, ...)
+_FICLONE = 0x40049409
+
+# setSADefaults/setSSTDefaults calls in referenceState, matched in one pass
+# (compiled once at import).  The first alternative is the block a previous
+# version of the patch inserted: an optional two-line comment followed by
+# both calls; the second catches any remaining stray call line.  Leading
+# whitespace and CRLF line endings are tolerated.
+_RE_SETTER_CALLS = re.compile(
+    rb"(?P<block>"
+    rb"(?:[ \t]*! Initialize turbulence model closure coefficients.*\n"
+    rb"[ \t]*! Must be called before any turbulence constants.*\n)?"
+    rb"(?P<indent>[ \t]*)call setSADefaults\(\)[ \t]*\r?\n"
+    rb"[ \t]*call setSSTDefaults\(\)[ \t]*\r?\n)"
+    rb"|[ \t]*call set(?:SA|SST)Defaults\(\)[ \t]*\r?\n"
+)
 
+# Comment left in place of the removed block.
+_NO_SETTER_CALLS_NOTE = (
+    b"! Turbulence closure coefficients are initialised by their module-level",
+    b"! default values in paramTurb.F90.  Do NOT call setSADefaults /",
+    b"! setSSTDefaults here, because referenceState is invoked every time",
+    b"! the AeroProblem changes, which would overwrite any user-supplied",
+    b"! custom coefficients set via setSAConstants / setSSTConstants.",
+)
 
-# ============================================================
-# 1. Patch paramTurb.F90
-# ============================================================
-def patch_paramturb():
-    """Replace paramTurb.F90: SA & SST constants become mutable with
-    default initial values, add setter subroutines."""
 
-    backup = PARAMTURB_F90 + ".bak"
-    if not os.path.exists(backup):
-        shutil.copy2(PARAMTURB_F90, backup)
+def _reflink(src_path, dst_fd):
+    """Make ``dst_fd`` a copy-on-write clone of ``src_path`` (FICLONE).
+    Returns False where reflinks are unsupported (ext4, tmpfs, NFS, ...)."""
+    if fcntl is None:
+        return False
+    try:
+        with open(src_path, "rb") as src:
+            fcntl.ioctl(dst_fd, _FICLONE, src.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def _patch_file(path, transform):
+    """Apply ``transform`` to the bytes of ``path`` and write the result back.
+
+    The file is read once as bytes and only rewritten (atomically, via a
+    temporary file and os.replace) when ``transform`` returns different
+    content, so an already-patched file keeps its mtime.  Before the first
+    rewrite the original is backed up to ``path + ".bak"``.
+
+    Returns True if the file was rewritten, False if it was left unchanged,
+    and None if it does not exist.
+    """
+    # The open doubles as the existence check (no separate stat)
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+    except FileNotFoundError:
+        print(f"  WARNING: {path} not found, skipping.")
+        return None
+
+    new_content = transform(content)
+    if new_content == content:
+        return False
+
+    # O_EXCL tests for and creates the backup in one call; an existing
+    # backup (the true original) is never overwritten.  Where the
+    # filesystem supports reflinks the backup is a FICLONE of the original
+    # (no data copied); otherwise the original bytes, already in memory,
+    # are written out.  The backup's own metadata is not copied: it is
+    # not needed to restore the file, and replicating xattrs (as copystat
+    # does) can fail on restricted filesystems (SELinux, NFS).
+    backup = path + ".bak"
+    try:
+        fd = os.open(backup, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        pass
+    else:
+        with open(fd, "wb") as f:
+            if not _reflink(path, f.fileno()):
+                f.write(content)
         print(f"  Backup: {backup}")
 
-    new_content = r"""module paramTurb
+    # Write to a temporary file next to the target and rename it into
+    # place: the target is never seen truncated or half-written, even if
+    # the patcher is interrupted.
+    tmp = path + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        with open(fd, "wb") as f:
+            f.write(new_content)
+            f.flush()
+            os.fsync(f.fileno())
+        shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return True
+
+
+# ============================================================
+# 1. Patch paramTurb.F90
+# ============================================================
+# Replacement paramTurb.F90, encoded once at import.
+_PARAMTURB_BODY = r"""module paramTurb
 !
 !       Module that contains the constants for the turbulence models.
 !
@@ -190,6 +301,8 @@ def patch_paramturb():
 
     logical, dimension(:), allocatable :: tuLogFit
 
+    private :: recompute_sa_derived
+
 contains
 
 ! ======================================================================
@@ -215,9 +328,7 @@ contains
         rsaCt4 = 0.5_realType
         rsaCrot = 2.0_realType
 
-        ! Derived constant: c_w1 = c_b1/kappa^2 + (1+c_b2)/sigma
-        rsaCw1 = rsaCb1 / (rsaK * rsaK) &
-                 + (1.0_realType + rsaCb2) / rsaCb3
+        call recompute_sa_derived()
 
     end subroutine setSADefaults
 
@@ -241,10 +352,21 @@ contains
         rsaCt4 = ct4
 
         ! CRITICAL: recompute derived constant c_w1
+        call recompute_sa_derived()
+
+    end subroutine setSAConstants
+
+    subroutine recompute_sa_derived()
+        !
+        ! Update the derived constant c_w1 = c_b1/kappa^2 + (1+c_b2)/sigma
+        ! from the current SA coefficients.  Shared by both SA setters.
+        !
+        implicit none
+
         rsaCw1 = rsaCb1 / (rsaK * rsaK) &
                  + (1.0_realType + rsaCb2) / rsaCb3
 
-    end subroutine setSAConstants
+    end subroutine recompute_sa_derived
 
 ! ======================================================================
 !   SST setter subroutines
@@ -296,11 +418,21 @@ contains
     end subroutine setSSTConstants
 
 end module paramTurb
-"""
+""".encode("ascii")
+
+
+def patch_paramturb():
+    """Replace paramTurb.F90: SA & SST constants become mutable with
+    default initial values, add setter subroutines."""
 
-    with open(PARAMTURB_F90, "w") as f:
-        f.write(new_content)
-    print(f"  Patched: {PARAMTURB_F90}")
+    # The file (and its mtime) is left alone when it already holds this
+    # content: a rewrite would make the build recompile every module that
+    # uses paramTurb, which is most of ADflow.
+    rewritten = _patch_file(PARAMTURB_F90, lambda content: _PARAMTURB_BODY)
+    if rewritten:
+        print(f"  Patched: {PARAMTURB_F90}")
+    elif rewritten is not None:
+        print(f"  {PARAMTURB_F90}: already patched, unchanged.")
 
 
 # ============================================================
@@ -312,42 +444,19 @@ def patch_initializeflow():
     switch and would overwrite user-supplied coefficients.  Defaults are
     provided by module-level initialisers in paramTurb.F90 instead."""
 
-    if not os.path.exists(INIT_FLOW_F90):
-        print(f"  WARNING: {INIT_FLOW_F90} not found, skipping.")
-        return
-
-    backup = INIT_FLOW_F90 + ".bak"
-    if not os.path.exists(backup):
-        shutil.copy2(INIT_FLOW_F90, backup)
-        print(f"  Backup: {backup}")
-
-    with open(INIT_FLOW_F90, "r") as f:
-        content = f.read()
-
-    # Remove any existing calls to setSADefaults / setSSTDefaults
-    # that a previous version of the patch may have inserted.
-    if "call setSADefaults" in content or "call setSSTDefaults" in content:
-        # Remove the call lines and any surrounding comment block we added
-        content = content.replace(
-            "        ! Initialize turbulence model closure coefficients to default values.\n"
-            "        ! Must be called before any turbulence constants are used.\n"
-            "        call setSADefaults()\n"
-            "        call setSSTDefaults()\n\n",
-            "        ! Turbulence closure coefficients are initialised by their module-level\n"
-            "        ! default values in paramTurb.F90.  Do NOT call setSADefaults /\n"
-            "        ! setSSTDefaults here, because referenceState is invoked every time\n"
-            "        ! the AeroProblem changes, which would overwrite any user-supplied\n"
-            "        ! custom coefficients set via setSAConstants / setSSTConstants.\n\n"
-        )
-        # Also handle the case where only the calls exist without our comment
-        content = re.sub(
-            r" *call setSADefaults\(\)\n", "", content
-        )
-        content = re.sub(
-            r" *call setSSTDefaults\(\)\n", "", content
-        )
+    # Remove any calls to setSADefaults / setSSTDefaults that a previous
+    # version of the patch may have inserted, in a single regex pass.
+    def replace_call(m):
+        if m.group("block") is None:
+            return b""
+        return b"".join(m.group("indent") + line + b"\n"
+                        for line in _NO_SETTER_CALLS_NOTE)
+
+    rewritten = _patch_file(
+        INIT_FLOW_F90, lambda content: _RE_SETTER_CALLS.sub(replace_call, content))
+    if rewritten:
         print(f"  Patched: {INIT_FLOW_F90} (removed setter calls from referenceState)")
-    else:
+    elif rewritten is not None:
         print(f"  {INIT_FLOW_F90}: no setter calls found, OK.")
 
 
@@ -358,58 +467,43 @@ def patch_sst():
     """In the f1SST subroutine, replace hardcoded 0.09_realType (beta*)
     with rSSTBetas from paramTurb, and add the necessary use statement."""
 
-    if not os.path.exists(SST_F90):
-        print(f"  WARNING: {SST_F90} not found, skipping.")
-        return
-
-    backup = SST_F90 + ".bak"
-    if not os.path.exists(backup):
-        shutil.copy2(SST_F90, backup)
-        print(f"  Backup: {backup}")
-
-    with open(SST_F90, "r") as f:
-        content = f.read()
-
-    changed = False
-
     # Add 'use paramTurb, only: rSSTBetas' to the f1SST subroutine
     # (it already has use constants, blockPointers, etc. but NOT paramTurb)
     old_imports = (
-        "        use constants\n"
-        "        use blockPointers\n"
-        "        use inputTimeSpectral\n"
-        "        use iteration\n"
-        "        use turbMod\n"
-        "        use utils, only: setPointers\n"
-        "        use turbUtils, only: kwCDTerm"
+        b"        use constants\n"
+        b"        use blockPointers\n"
+        b"        use inputTimeSpectral\n"
+        b"        use iteration\n"
+        b"        use turbMod\n"
+        b"        use utils, only: setPointers\n"
+        b"        use turbUtils, only: kwCDTerm"
     )
     new_imports = (
-        "        use constants\n"
-        "        use blockPointers\n"
-        "        use inputTimeSpectral\n"
-        "        use iteration\n"
-        "        use turbMod\n"
-        "        use paramTurb, only: rSSTBetas\n"
-        "        use utils, only: setPointers\n"
-        "        use turbUtils, only: kwCDTerm"
+        b"        use constants\n"
+        b"        use blockPointers\n"
+        b"        use inputTimeSpectral\n"
+        b"        use iteration\n"
+        b"        use turbMod\n"
+        b"        use paramTurb, only: rSSTBetas\n"
+        b"        use utils, only: setPointers\n"
+        b"        use turbUtils, only: kwCDTerm"
     )
-    if old_imports in content and "use paramTurb, only: rSSTBetas" not in content:
-        content = content.replace(old_imports, new_imports, 1)
-        changed = True
-
-    # Replace the hardcoded 0.09_realType with rSSTBetas in the f1 blending
-    if "0.09_realType * w(i, j, k, itu2) * d2Wall(i, j, k))" in content:
-        content = content.replace(
-            "0.09_realType * w(i, j, k, itu2) * d2Wall(i, j, k))",
-            "rSSTBetas * w(i, j, k, itu2) * d2Wall(i, j, k))"
+
+    # Insert the use statement and replace the hardcoded 0.09_realType with
+    # rSSTBetas in the f1 blending.  Both replaces run unconditionally:
+    # bytes.replace is a no-op when the needle is absent, and once patched
+    # the inserted use line breaks the old_imports match, so a re-run
+    # changes nothing.  One comparison replaces the per-needle `in` probes.
+    def transform(content):
+        return content.replace(old_imports, new_imports, 1).replace(
+            b"0.09_realType * w(i, j, k, itu2) * d2Wall(i, j, k))",
+            b"rSSTBetas * w(i, j, k, itu2) * d2Wall(i, j, k))"
         )
-        changed = True
 
-    if changed:
-        with open(SST_F90, "w") as f:
-            f.write(content)
+    rewritten = _patch_file(SST_F90, transform)
+    if rewritten:
         print(f"  Patched: {SST_F90}")
-    else:
+    elif rewritten is not None:
         print(f"  {SST_F90}: already patched or pattern not found.")
 
 
@@ -420,86 +514,118 @@ def patch_turbutils():
     """In SSTEddyViscosity, replace hardcoded 0.09_realType (beta*) with
     rSSTBetas.  paramTurb is already imported in this subroutine."""
 
-    if not os.path.exists(TURBUTILS_F90):
-        print(f"  WARNING: {TURBUTILS_F90} not found, skipping.")
-        return
-
-    backup = TURBUTILS_F90 + ".bak"
-    if not os.path.exists(backup):
-        shutil.copy2(TURBUTILS_F90, backup)
-        print(f"  Backup: {backup}")
-
-    with open(TURBUTILS_F90, "r") as f:
-        content = f.read()
-
-    if "0.09_realType * w(i, j, k, itu2) * d2Wall(i, j, k))" in content:
-        content = content.replace(
-            "0.09_realType * w(i, j, k, itu2) * d2Wall(i, j, k))",
-            "rSSTBetas * w(i, j, k, itu2) * d2Wall(i, j, k))"
-        )
-        with open(TURBUTILS_F90, "w") as f:
-            f.write(content)
+    # bytes.replace is a no-op when the needle is absent, so _patch_file's
+    # comparison doubles as the "already patched" check
+    rewritten = _patch_file(TURBUTILS_F90, lambda content: content.replace(
+        b"0.09_realType * w(i, j, k, itu2) * d2Wall(i, j, k))",
+        b"rSSTBetas * w(i, j, k, itu2) * d2Wall(i, j, k))"
+    ))
+    if rewritten:
         print(f"  Patched: {TURBUTILS_F90}")
-    else:
+    elif rewritten is not None:
         print(f"  {TURBUTILS_F90}: already patched or pattern not found.")
 
 
 # ============================================================
 # Main
 # ============================================================
+# Post-patch instructions, written in one go at the end of main().
+_BANNER = """\
+
+======================================================================
+Patch complete!
+======================================================================
+
+Next steps:
+  1. Rebuild ADflow:
+     cd /path/to/adflow
+     make clean && make
+     pip install -e .
+
+  2. Copy adflow_turb_ctypes.py to your working directory
+
+Python API (via ctypes -- recommended):
+
+  from adflow_turb_ctypes import (
+      set_sa_constants, set_sa_defaults, get_sa_constants,
+      set_sst_constants, set_sst_defaults, get_sst_constants,
+  )
+
+  # --- SA model (9 calibration params + auto cw1) ---
+  set_sa_constants(
+      cb1=0.1355, cb2=0.622, sigma=2./3.,
+      kappa=0.41, cv1=7.1, cw2=0.3, cw3=2.0,
+      ct3=1.2, ct4=0.5)
+
+  # --- SST model (9 independent params) ---
+  set_sst_constants(
+      sstk=0.41, a1=0.31, betas=0.09,
+      sigk1=0.85, sigw1=0.5, beta1=0.075,
+      sigk2=1.0, sigw2=0.856, beta2=0.0828)
+
+WARNING: Do NOT use the f2py module variable interface
+  (pt = solver.adflow.paramturb; pt.rsacb1 = ...) for coefficient
+  modification.  f2py has a memory duplication bug that makes
+  modifications appear to succeed while having zero effect on
+  the CFD computation.  Use the ctypes API above instead.
+"""
+
+
+def _patch_stamp():
+    """Signature of a patched tree: a hash of this patcher's source followed
+    by the mtime and size of each patched file.  Any edit to the patcher or
+    to one of the sources (including reverting it) changes the stamp.
+    Returns None if a source file is missing."""
+    with open(__file__, "rb") as f:
+        lines = [hashlib.blake2b(f.read(), digest_size=16).hexdigest()]
+    for path in (PARAMTURB_F90, INIT_FLOW_F90, SST_F90, TURBUTILS_F90):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        lines.append(f"{st.st_mtime_ns} {st.st_size} {path}")
+    return "\n".join(lines) + "\n"
+
+
 def main():
     print("=" * 70)
     print("Patching ADflow for runtime SA + SST coefficient modification")
     print("=" * 70)
 
-    print("\n[1/4] Patching paramTurb.F90 (SA + SST mutable with initialisers)...")
-    patch_paramturb()
-
-    print("\n[2/4] Checking initializeFlow.F90 (no setter calls in referenceState)...")
-    patch_initializeflow()
-
-    print("\n[3/4] Patching SST.F90 (f1 blending: 0.09 -> rSSTBetas)...")
-    patch_sst()
-
-    print("\n[4/4] Patching turbUtils.F90 (eddy viscosity: 0.09 -> rSSTBetas)...")
-    patch_turbutils()
+    # Nothing to do if the sentinel from the last run still matches: same
+    # patcher, and none of the four sources touched since.  This costs a
+    # few stats instead of reading and comparing every file.
+    stamp = _patch_stamp()
+    try:
+        with open(PATCH_SENTINEL) as f:
+            up_to_date = stamp is not None and f.read() == stamp
+    except FileNotFoundError:
+        up_to_date = False
+    if up_to_date:
+        print(f"\nAlready patched ({PATCH_SENTINEL} is up to date), nothing to do.")
+        return
 
-    print("\n" + "=" * 70)
-    print("Patch complete!")
-    print("=" * 70)
-    print()
-    print("Next steps:")
-    print("  1. Rebuild ADflow:")
-    print("     cd /path/to/adflow")
-    print("     make clean && make")
-    print("     pip install -e .")
-    print()
-    print("  2. Copy adflow_turb_ctypes.py to your working directory")
-    print()
-    print("Python API (via ctypes -- recommended):")
-    print()
-    print("  from adflow_turb_ctypes import (")
-    print("      set_sa_constants, set_sa_defaults, get_sa_constants,")
-    print("      set_sst_constants, set_sst_defaults, get_sst_constants,")
-    print("  )")
-    print()
-    print("  # --- SA model (9 calibration params + auto cw1) ---")
-    print("  set_sa_constants(")
-    print("      cb1=0.1355, cb2=0.622, sigma=2./3.,")
-    print("      kappa=0.41, cv1=7.1, cw2=0.3, cw3=2.0,")
-    print("      ct3=1.2, ct4=0.5)")
-    print()
-    print("  # --- SST model (9 independent params) ---")
-    print("  set_sst_constants(")
-    print("      sstk=0.41, a1=0.31, betas=0.09,")
-    print("      sigk1=0.85, sigw1=0.5, beta1=0.075,")
-    print("      sigk2=1.0, sigw2=0.856, beta2=0.0828)")
-    print()
-    print("WARNING: Do NOT use the f2py module variable interface")
-    print("  (pt = solver.adflow.paramturb; pt.rsacb1 = ...) for coefficient")
-    print("  modification.  f2py has a memory duplication bug that makes")
-    print("  modifications appear to succeed while having zero effect on")
-    print("  the CFD computation.  Use the ctypes API above instead.")
+    steps = [
+        ("[1/4] Patching paramTurb.F90 (SA + SST mutable with initialisers)...",
+         patch_paramturb),
+        ("[2/4] Checking initializeFlow.F90 (no setter calls in referenceState)...",
+         patch_initializeflow),
+        ("[3/4] Patching SST.F90 (f1 blending: 0.09 -> rSSTBetas)...",
+         patch_sst),
+        ("[4/4] Patching turbUtils.F90 (eddy viscosity: 0.09 -> rSSTBetas)...",
+         patch_turbutils),
+    ]
+
+    for title, step in steps:
+        print("\n" + title)
+        step()
+
+    stamp = _patch_stamp()
+    if stamp is not None:
+        with open(PATCH_SENTINEL, "w") as f:
+            f.write(stamp)
+
+    sys.stdout.write(_BANNER)
 
 
 if __name__ == "__main__":
@@ -23,34 +23,57 @@ from adflow_turb_ctypes import (
     set_sst_constants, set_sst_defaults, get_sst_constants,
 )
 
+# Expected / perturbed coefficient values, as (name, value) pairs
+SA_DEFAULTS = (
+    ("cb1",   0.1355),
+    ("cb2",   0.622),
+    ("sigma", 0.66666666667),   # 2/3
+    ("kappa", 0.41),
+    ("cv1",   7.1),
+    ("cw2",   0.3),
+    ("cw3",   2.0),
+    ("ct3",   1.2),
+    ("ct4",   0.5),
+)
+
+SST_DEFAULTS = (
+    ("sstk",  0.41),
+    ("a1",    0.31),
+    ("betas", 0.09),
+    ("sigk1", 0.85),
+    ("sigw1", 0.5),
+    ("beta1", 0.075),
+    ("sigk2", 1.0),
+    ("sigw2", 0.856),
+    ("beta2", 0.0828),
+)
+
+SA_PERTURBED = (
+    ("cb1", 0.14), ("cb2", 0.65), ("sigma", 0.7), ("kappa", 0.40),
+    ("cv1", 7.0), ("cw2", 0.055), ("cw3", 2.5),
+    ("ct3", 1.0), ("ct4", 0.4),
+)
+
+SST_PERTURBED = (
+    ("sstk", 0.38), ("a1", 0.28), ("betas", 0.08),
+    ("sigk1", 0.75), ("sigw1", 0.45), ("beta1", 0.06),
+    ("sigk2", 0.9), ("sigw2", 0.8), ("beta2", 0.07),
+)
+
 
 def test_sa_defaults():
     """Test 1: Verify SA default values after set_sa_defaults()."""
-    print("\n[Test 1] SA defaults after set_sa_defaults()")
-    print("-" * 60)
+    lines = ["\n[Test 1] SA defaults after set_sa_defaults()", "-" * 60]
 
     set_sa_defaults()
     c = get_sa_constants()
 
-    expected = {
-        "cb1":   0.1355,
-        "cb2":   0.622,
-        "sigma": 0.66666666667,   # 2/3
-        "kappa": 0.41,
-        "cv1":   7.1,
-        "cw2":   0.3,
-        "cw3":   2.0,
-        "ct3":   1.2,
-        "ct4":   0.5,
-    }
-
-    all_ok = True
-    for key, exp in expected.items():
-        actual = c[key]
-        ok = abs(actual - exp) < 1e-6
-        if not ok:
-            all_ok = False
-        print(f"  {key:8s} = {actual:12.8f}  expected {exp:12.8f}  [{'OK' if ok else 'FAIL'}]")
+    # Pass/fail is decided up front; the loop below only formats the report
+    status = {key: abs(c[key] - exp) < 1e-6 for key, exp in SA_DEFAULTS}
+    all_ok = all(status.values())
+    for key, exp in SA_DEFAULTS:
+        lines.append(f"  {key:8s} = {c[key]:12.8f}  expected {exp:12.8f}  "
+                     f"[{'OK' if status[key] else 'FAIL'}]")
 
     # Check derived cw1
     expected_cw1 = 0.1355 / (0.41 ** 2) + (1.0 + 0.622) / (2.0 / 3.0)
@@ -58,125 +81,88 @@ def test_sa_defaults():
     ok = abs(actual_cw1 - expected_cw1) < 1e-6
     if not ok:
         all_ok = False
-    print(f"  {'cw1':8s} = {actual_cw1:12.8f}  expected {expected_cw1:12.8f}  [{'OK' if ok else 'FAIL'}]  (derived)")
+    lines.append(f"  {'cw1':8s} = {actual_cw1:12.8f}  expected {expected_cw1:12.8f}  "
+                 f"[{'OK' if ok else 'FAIL'}]  (derived)")
 
-    print(f"\n  SA defaults: {'ALL OK' if all_ok else 'FAILED'}")
+    lines.append(f"\n  SA defaults: {'ALL OK' if all_ok else 'FAILED'}")
+    sys.stdout.write("\n".join(lines) + "\n")
     return all_ok
 
 
 def test_sst_defaults():
     """Test 2: Verify SST default values after set_sst_defaults()."""
-    print("\n[Test 2] SST defaults after set_sst_defaults()")
-    print("-" * 60)
+    lines = ["\n[Test 2] SST defaults after set_sst_defaults()", "-" * 60]
 
     set_sst_defaults()
     c = get_sst_constants()
 
-    expected = {
-        "sstk":  0.41,
-        "a1":    0.31,
-        "betas": 0.09,
-        "sigk1": 0.85,
-        "sigw1": 0.5,
-        "beta1": 0.075,
-        "sigk2": 1.0,
-        "sigw2": 0.856,
-        "beta2": 0.0828,
-    }
-
-    all_ok = True
-    for key, exp in expected.items():
-        actual = c[key]
-        ok = abs(actual - exp) < 1e-6
-        if not ok:
-            all_ok = False
-        print(f"  {key:8s} = {actual:12.8f}  expected {exp:12.8f}  [{'OK' if ok else 'FAIL'}]")
-
-    print(f"\n  SST defaults: {'ALL OK' if all_ok else 'FAILED'}")
+    status = {key: abs(c[key] - exp) < 1e-6 for key, exp in SST_DEFAULTS}
+    all_ok = all(status.values())
+    for key, exp in SST_DEFAULTS:
+        lines.append(f"  {key:8s} = {c[key]:12.8f}  expected {exp:12.8f}  "
+                     f"[{'OK' if status[key] else 'FAIL'}]")
+
+    lines.append(f"\n  SST defaults: {'ALL OK' if all_ok else 'FAILED'}")
+    sys.stdout.write("\n".join(lines) + "\n")
     return all_ok
 
 
 def test_sa_setter():
     """Test 3: set_sa_constants() with 9 params + auto cw1 recompute."""
-    print("\n[Test 3] set_sa_constants(9 params) + cw1 auto-recompute")
-    print("-" * 60)
+    lines = ["\n[Test 3] set_sa_constants(9 params) + cw1 auto-recompute", "-" * 60]
 
-    cb1, cb2, sigma, kappa = 0.14, 0.65, 0.7, 0.40
-    cv1, cw2, cw3 = 7.0, 0.055, 2.5
-    ct3, ct4 = 1.0, 0.4
-
-    set_sa_constants(cb1, cb2, sigma, kappa, cv1, cw2, cw3, ct3, ct4)
+    params = dict(SA_PERTURBED)
+    set_sa_constants(**params)
     c = get_sa_constants()
 
-    checks = {
-        "cb1":   cb1,
-        "cb2":   cb2,
-        "sigma": sigma,
-        "kappa": kappa,
-        "cv1":   cv1,
-        "cw2":   cw2,
-        "cw3":   cw3,
-        "ct3":   ct3,
-        "ct4":   ct4,
-    }
-
-    all_ok = True
-    for key, exp in checks.items():
-        actual = c[key]
-        ok = abs(actual - exp) < 1e-10
-        if not ok:
-            all_ok = False
-        print(f"  {key:8s} = {actual:12.8f}  expected {exp:12.8f}  [{'OK' if ok else 'FAIL'}]")
+    status = {key: abs(c[key] - exp) < 1e-10 for key, exp in SA_PERTURBED}
+    all_ok = all(status.values())
+    for key, exp in SA_PERTURBED:
+        lines.append(f"  {key:8s} = {c[key]:12.8f}  expected {exp:12.8f}  "
+                     f"[{'OK' if status[key] else 'FAIL'}]")
 
     # Verify cw1 derived
-    expected_cw1 = cb1 / (kappa ** 2) + (1.0 + cb2) / sigma
+    expected_cw1 = (params["cb1"] / (params["kappa"] ** 2)
+                    + (1.0 + params["cb2"]) / params["sigma"])
     actual_cw1 = c["cw1"]
     ok = abs(actual_cw1 - expected_cw1) < 1e-6
     if not ok:
         all_ok = False
-    print(f"  {'cw1':8s} = {actual_cw1:12.8f}  expected {expected_cw1:12.8f}  [{'OK' if ok else 'FAIL'}]  (derived)")
+    lines.append(f"  {'cw1':8s} = {actual_cw1:12.8f}  expected {expected_cw1:12.8f}  "
+                 f"[{'OK' if ok else 'FAIL'}]  (derived)")
 
     # Restore
     set_sa_defaults()
 
-    print(f"\n  SA setter: {'ALL OK' if all_ok else 'FAILED'}")
+    lines.append(f"\n  SA setter: {'ALL OK' if all_ok else 'FAILED'}")
+    sys.stdout.write("\n".join(lines) + "\n")
     return all_ok
 
 
 def test_sst_setter():
     """Test 4: set_sst_constants() with 9 params."""
-    print("\n[Test 4] set_sst_constants(9 params)")
-    print("-" * 60)
-
-    # Perturbed values
-    params = {
-        "sstk": 0.38, "a1": 0.28, "betas": 0.08,
-        "sigk1": 0.75, "sigw1": 0.45, "beta1": 0.06,
-        "sigk2": 0.9, "sigw2": 0.8, "beta2": 0.07,
-    }
+    lines = ["\n[Test 4] set_sst_constants(9 params)", "-" * 60]
 
-    set_sst_constants(**params)
+    set_sst_constants(**dict(SST_PERTURBED))
     c = get_sst_constants()
 
-    all_ok = True
-    for key, exp in params.items():
-        actual = c[key]
-        ok = abs(actual - exp) < 1e-10
-        if not ok:
-            all_ok = False
-        print(f"  {key:8s} = {actual:12.8f}  expected {exp:12.8f}  [{'OK' if ok else 'FAIL'}]")
+    status = {key: abs(c[key] - exp) < 1e-10 for key, exp in SST_PERTURBED}
+    all_ok = all(status.values())
+    for key, exp in SST_PERTURBED:
+        lines.append(f"  {key:8s} = {c[key]:12.8f}  expected {exp:12.8f}  "
+                     f"[{'OK' if status[key] else 'FAIL'}]")
 
     # Restore
     set_sst_defaults()
 
-    print(f"\n  SST setter: {'ALL OK' if all_ok else 'FAILED'}")
+    lines.append(f"\n  SST setter: {'ALL OK' if all_ok else 'FAILED'}")
+    sys.stdout.write("\n".join(lines) + "\n")
     return all_ok
 
 
 def test_sa_reset():
     """Test 5: Verify set_sa_defaults() restores after modification."""
-    print("\n[Test 5] SA reset after modification")
-    print("-" * 60)
+    lines = ["\n[Test 5] SA reset after modification", "-" * 60]
 
     # Modify
     set_sa_constants(0.5, 0.8, 0.9, 0.35, 6.0, 0.4, 3.0, 1.5, 0.8)
@@ -191,18 +177,18 @@ def test_sa_reset():
     ok_modified = abs(modified_cb1 - 0.5) < 1e-10
     ok_reset = abs(reset_cb1 - 0.1355) < 1e-6
 
-    print(f"  After set:   cb1 = {modified_cb1:.8f}  (expect 0.5)       [{'OK' if ok_modified else 'FAIL'}]")
-    print(f"  After reset: cb1 = {reset_cb1:.8f}  (expect 0.1355)    [{'OK' if ok_reset else 'FAIL'}]")
+    lines.append(f"  After set:   cb1 = {modified_cb1:.8f}  (expect 0.5)       [{'OK' if ok_modified else 'FAIL'}]")
+    lines.append(f"  After reset: cb1 = {reset_cb1:.8f}  (expect 0.1355)    [{'OK' if ok_reset else 'FAIL'}]")
 
     all_ok = ok_modified and ok_reset
-    print(f"\n  SA reset: {'ALL OK' if all_ok else 'FAILED'}")
+    lines.append(f"\n  SA reset: {'ALL OK' if all_ok else 'FAILED'}")
+    sys.stdout.write("\n".join(lines) + "\n")
     return all_ok
 
 
 def test_sst_reset():
     """Test 6: Verify set_sst_defaults() restores after modification."""
-    print("\n[Test 6] SST reset after modification")
-    print("-" * 60)
+    lines = ["\n[Test 6] SST reset after modification", "-" * 60]
 
     # Modify
     set_sst_constants(0.35, 0.25, 0.07, 0.7, 0.4, 0.06, 0.8, 0.7, 0.06)
@@ -217,39 +203,41 @@ def test_sst_reset():
     ok_modified = abs(modified_betas - 0.07) < 1e-10
     ok_reset = abs(reset_betas - 0.09) < 1e-6
 
-    print(f"  After set:   betas = {modified_betas:.8f}  (expect 0.07)    [{'OK' if ok_modified else 'FAIL'}]")
-    print(f"  After reset: betas = {reset_betas:.8f}  (expect 0.09)    [{'OK' if ok_reset else 'FAIL'}]")
+    lines.append(f"  After set:   betas = {modified_betas:.8f}  (expect 0.07)    [{'OK' if ok_modified else 'FAIL'}]")
+    lines.append(f"  After reset: betas = {reset_betas:.8f}  (expect 0.09)    [{'OK' if ok_reset else 'FAIL'}]")
 
     all_ok = ok_modified and ok_reset
-    print(f"\n  SST reset: {'ALL OK' if all_ok else 'FAILED'}")
+    lines.append(f"\n  SST reset: {'ALL OK' if all_ok else 'FAILED'}")
+    sys.stdout.write("\n".join(lines) + "\n")
     return all_ok
 
 
+# (name, test) pairs, run in this order by main()
+TESTS = (
+    ("sa_defaults", test_sa_defaults),
+    ("sst_defaults", test_sst_defaults),
+    ("sa_setter", test_sa_setter),
+    ("sst_setter", test_sst_setter),
+    ("sa_reset", test_sa_reset),
+    ("sst_reset", test_sst_reset),
+)
+
+
 def main():
     print("=" * 70)
     print("ADflow SA + SST Turbulence Coefficient Validation (ctypes API)")
     print("=" * 70)
 
-    results = {}
-    results["sa_defaults"] = test_sa_defaults()
-    results["sst_defaults"] = test_sst_defaults()
-    results["sa_setter"] = test_sa_setter()
-    results["sst_setter"] = test_sst_setter()
-    results["sa_reset"] = test_sa_reset()
-    results["sst_reset"] = test_sst_reset()
+    results = [(name, test()) for name, test in TESTS]
 
     print("\n" + "=" * 70)
     print("Summary")
     print("=" * 70)
-    all_pass = True
-    for name, ok in results.items():
-        status = "PASS" if ok else "FAIL"
-        if not ok:
-            all_pass = False
-        print(f"  {name:20s}: {status}")
+    for name, ok in results:
+        print(f"  {name:20s}: {'PASS' if ok else 'FAIL'}")
 
     print()
-    if all_pass:
+    if all(ok for _, ok in results):
         print("  ALL TESTS PASSED (ctypes API)")
     else:
         print("  SOME TESTS FAILED")